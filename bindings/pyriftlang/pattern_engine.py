@@ -1,13 +1,34 @@
 # pyrift/targets/pattern_engine.py
 # Polar Bipartite Pattern Matching Engine - Python Implementation
 
+import bisect
 import re
+import sys
 import threading
-from typing import List, Optional, Tuple, Dict, Callable
+import weakref
+from time import perf_counter_ns
+from typing import List, Optional, Tuple, Dict, Callable, Union, Iterator
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from enum import IntEnum
 
 
+# Capture-group placeholders in right templates: $1 or {name}
+_PLACEHOLDER_RE = re.compile(r'\$(\d+)|\{(\w+)\}')
+
+# Characters that end a literal prefix, and quantifiers that make the
+# preceding character optional
+_REGEX_META = frozenset('.^$*+?{}[]\\|()')
+_QUANTIFIERS = frozenset('*+?{')
+
+# Cache entry for inputs no pair matches; see PatternEngine.match
+_NO_MATCH = (False, None, 0, 0, ())
+
+# Match.expand caches compiled templates in C from 3.12; older versions
+# re-parse the template in Python on every call and use str.format instead
+_NATIVE_EXPAND = sys.version_info >= (3, 12)
+
+
 class PatternPolarity(IntEnum):
     LEFT = 0   # Input/matcher
     RIGHT = 1  # Output/generator
@@ -22,6 +43,15 @@ class RiftPattern:
     anchored: bool
     is_literal: bool
     compiled_regex: Optional[re.Pattern] = None
+    # Left patterns only: text every anchored match must start with
+    literal_prefix: Optional[str] = None
+    # Right templates only: (literal, None) or ('', group reference)
+    template_segments: List[Tuple[str, Optional[Union[int, str]]]] = field(
+        default_factory=list)
+    # Same template in Match.expand syntax (\g<ref>)
+    expand_template: Optional[str] = None
+    # Same template as a str.format string over Match.groups('')
+    format_template: Optional[str] = None
 
 
 @dataclass
@@ -52,33 +82,72 @@ class PatternEngine:
     """
     
     def __init__(self, mode: str = "classical"):
-        self.pairs: List[BipartitePair] = []
+        self.pairs: List[BipartitePair] = []  # kept sorted by priority
+        self._priorities: List[int] = []      # parallel sort keys for bisect
         self.mode = mode
         self._lock = threading.RLock()
         
-        # Metrics
-        self.total_matches = 0
-        self.total_failures = 0
-        self.average_match_time_ms = 0.0
+        # Immutable copy of pairs read by match() without taking the lock;
+        # add_pair rebinds it, never mutates it
+        self._pairs_snapshot: Tuple[BipartitePair, ...] = ()
+        
+        # LRU of results by input string, tied to the snapshot it was built
+        # on; entries are immutable (matched, output, priority, transform_id,
+        # group items) tuples, so callers cannot corrupt them
+        self._match_cache: Tuple[Tuple[BipartitePair, ...],
+                                 OrderedDict] = ((), OrderedDict())
+        self._cache_cap = 1024
+        
+        # Metrics, accumulated per thread and summed on read; match timing
+        # is off unless enable_metrics() is called
+        self._metrics_enabled = False
+        self._local = threading.local()
+        self._counters: List[_MatchCounters] = []
+        self._retired = _MatchCounters()  # totals from finished threads
     
-    def add_pair(self, left_pattern: str, right_pattern: str, 
+    def enable_metrics(self, enabled: bool = True) -> None:
+        """Turn per-match timing on or off"""
+        self._metrics_enabled = enabled
+    
+    def add_pair(self, left_pattern: Union[str, re.Pattern], right_pattern: str,
                  priority: int = 100, right_is_literal: bool = False) -> bool:
-        """Add a bipartite pattern pair"""
+        """Add a bipartite pattern pair
+        
+        left_pattern may be a pattern string or an already compiled
+        str pattern, which is used as-is.
+        """
         with self._lock:
+            # Compile left regex
+            if isinstance(left_pattern, re.Pattern):
+                if not isinstance(left_pattern.pattern, str):
+                    return False
+                compiled = left_pattern
+            else:
+                try:
+                    compiled = re.compile(left_pattern)
+                except re.error:
+                    return False
+            
             # Create left pattern (input matcher)
+            anchored, literal_prefix = _analyze_left(compiled)
             left = RiftPattern(
-                pattern_str=left_pattern,
+                pattern_str=compiled.pattern,
                 polarity=PatternPolarity.LEFT,
                 priority=priority,
-                anchored=left_pattern.startswith('^'),
-                is_literal=False
+                anchored=anchored,
+                is_literal=False,
+                compiled_regex=compiled,
+                literal_prefix=literal_prefix
             )
             
-            # Compile left regex
-            try:
-                left.compiled_regex = re.compile(left_pattern)
-            except re.error:
-                return False
+            # Anchored patterns are run with .match(), which makes the
+            # leading '^' redundant
+            if anchored:
+                try:
+                    left.compiled_regex = re.compile(
+                        compiled.pattern[1:], compiled.flags)
+                except re.error:
+                    pass
             
             # Create right pattern (output generator)
             right = RiftPattern(
@@ -96,6 +165,18 @@ class PatternEngine:
                 except re.error:
                     right.is_literal = True
             
+            # Parse the template once so match() only fills in groups
+            if not right.is_literal:
+                right.template_segments = _compile_template(
+                    right_pattern, left.compiled_regex)
+                right.is_literal = all(
+                    ref is None for _, ref in right.template_segments)
+                if not right.is_literal:
+                    right.expand_template = _expand_template(
+                        right.template_segments)
+                    right.format_template = _format_template(
+                        right.template_segments, left.compiled_regex)
+            
             # Create pair
             pair = BipartitePair(
                 left=left,
@@ -103,86 +184,328 @@ class PatternEngine:
                 transform_id=len(self.pairs) + 1
             )
             
-            self.pairs.append(pair)
+            # Insert after equal priorities so ties keep insertion order
+            index = bisect.bisect_right(self._priorities, priority)
+            self._priorities.insert(index, priority)
+            self.pairs.insert(index, pair)
+            self._pairs_snapshot = tuple(self.pairs)
+            self._match_cache = (self._pairs_snapshot, OrderedDict())
             return True
     
     def match(self, input_str: str) -> MatchResult:
-        """Match input against all left patterns, return best match"""
-        import time
+        """Match input against all left patterns, return best match
         
-        start_time = time.time()
+        Results are cached per input string; every call returns a fresh
+        MatchResult built from the cached entry.
+        """
+        timed = self._metrics_enabled
+        start_ns = perf_counter_ns() if timed else 0
         
-        with self._lock:
-            best_pair: Optional[BipartitePair] = None
-            best_priority = float('inf')
-            best_match = None
-            
-            # Search for matching pattern (respecting priority)
-            for pair in self.pairs:
-                if pair.left.compiled_regex:
-                    match = pair.left.compiled_regex.search(input_str)
-                    if match:
-                        # Lower priority number = higher priority
-                        if pair.left.priority < best_priority:
-                            best_pair = pair
-                            best_priority = pair.left.priority
-                            best_match = match
-            
-            # Generate output
-            if best_pair:
-                template = best_pair.right.pattern_str
-                
-                if best_pair.right.is_literal:
-                    output = template
+        # Lock-free: work from one consistent snapshot of the pairs
+        pairs = self._pairs_snapshot
+        cache_pairs, cache = self._match_cache
+        if cache_pairs is not pairs:
+            cache = OrderedDict()
+            self._match_cache = (pairs, cache)
+        
+        entry = cache.get(input_str)
+        if entry is not None:
+            try:
+                cache.move_to_end(input_str)
+            except KeyError:
+                pass  # Evicted by another thread meanwhile
+        else:
+            entry = self._match_uncached(pairs, input_str)
+            cache[input_str] = entry
+            if len(cache) > self._cache_cap:
+                try:
+                    cache.popitem(last=False)
+                except KeyError:
+                    pass
+        
+        matched, output, priority, transform_id, groups = entry
+        result = MatchResult(matched, output, priority, transform_id,
+                             dict(groups))
+        
+        counters = self._thread_counters()
+        if matched:
+            counters.matches += 1
+        else:
+            counters.failures += 1
+        
+        if timed:
+            counters.total_ns += perf_counter_ns() - start_ns
+            counters.timed += 1
+        
+        return result
+    
+    def _match_uncached(self, pairs: Tuple[BipartitePair, ...],
+                        input_str: str) -> tuple:
+        """Find the best pair for input_str and render its output
+        
+        Returns the cache entry described in __init__.
+        """
+        best_pair, best_match = self._search_pairs(pairs, input_str)
+        
+        # No match found
+        if not best_pair:
+            return _NO_MATCH
+        
+        # Generate output
+        template = best_pair.right.pattern_str
+        
+        if best_pair.right.is_literal:
+            output = template
+        elif _NATIVE_EXPAND:
+            output = best_match.expand(best_pair.right.expand_template)
+        else:
+            # One C-level pass over the template; unmatched groups are ''
+            output = best_pair.right.format_template.format(
+                *best_match.groups(''))
+        
+        return (True, output, best_pair.left.priority, best_pair.transform_id,
+                tuple(best_match.groupdict().items()))
+    
+    @staticmethod
+    def _search_pairs(pairs: Tuple[BipartitePair, ...], input_str: str
+                      ) -> Tuple[Optional[BipartitePair], Optional[re.Match]]:
+        """Scan each left pattern in priority order"""
+        # Pairs are sorted by priority (lower number = higher priority),
+        # so the first hit is the best match. A fused alternation of all
+        # left patterns was measured slower here: re backtracks through
+        # it and loses each pattern's own prefix search
+        for pair in pairs:
+            prefix = pair.left.literal_prefix
+            if prefix and not input_str.startswith(prefix):
+                continue
+            regex = pair.left.compiled_regex
+            if regex:
+                if pair.left.anchored:
+                    match = regex.match(input_str)
                 else:
-                    # Simple substitution for capture groups
-                    output = template
-                    if best_match:
-                        for i, group in enumerate(best_match.groups() or [], 1):
-                            output = output.replace(f'${i}', group or '')
-                        # Named groups
-                        for name, value in (best_match.groupdict() or {}).items():
-                            output = output.replace(f'{{{name}}}', value or '')
-                
-                # Update metrics
-                elapsed = (time.time() - start_time) * 1000
-                self.total_matches += 1
-                self._update_metrics(elapsed)
-                
-                return MatchResult(
-                    matched=True,
-                    output=output,
-                    priority=best_priority,
-                    transform_id=best_pair.transform_id,
-                    groups=best_match.groupdict() if best_match else {}
-                )
-            
-            # No match found
-            elapsed = (time.time() - start_time) * 1000
-            self.total_failures += 1
-            self._update_metrics(elapsed)
-            
-            return MatchResult(matched=False)
+                    match = regex.search(input_str)
+                if match:
+                    return pair, match
+        return None, None
+    
+    def _thread_counters(self) -> '_MatchCounters':
+        """Get the calling thread's metrics accumulator"""
+        try:
+            return self._local.counters
+        except AttributeError:
+            counters = _MatchCounters(threading.current_thread())
+            with self._lock:
+                self._retire_counters()
+                self._counters.append(counters)
+            self._local.counters = counters
+            return counters
+    
+    def _retire_counters(self) -> None:
+        """Fold accumulators of finished threads into the retired totals
+        
+        Keeps the accumulator list bounded by the number of live threads.
+        Must be called with the lock held.
+        """
+        live = []
+        for counters in self._counters:
+            if counters.thread_alive():
+                live.append(counters)
+            else:
+                self._retired.absorb(counters)
+        self._counters = live
+    
+    @property
+    def total_matches(self) -> int:
+        """Successful matches across all threads"""
+        return self.get_metrics()['total_matches']
     
-    def _update_metrics(self, elapsed_ms: float) -> None:
-        """Update running average match time"""
-        total = self.total_matches + self.total_failures
-        if total > 0:
-            self.average_match_time_ms = (
-                (self.average_match_time_ms * (total - 1)) + elapsed_ms
-            ) / total
+    @property
+    def total_failures(self) -> int:
+        """Failed matches across all threads"""
+        return self.get_metrics()['total_failures']
+    
+    @property
+    def average_match_time_ms(self) -> float:
+        """Mean match time across all threads"""
+        return self.get_metrics()['average_match_time_ms']
     
     def get_metrics(self) -> Dict[str, any]:
         """Get engine metrics"""
         with self._lock:
+            self._retire_counters()
+            totals = _MatchCounters()
+            totals.absorb(self._retired)
+            for counters in self._counters:
+                totals.absorb(counters)
             return {
-                'total_matches': self.total_matches,
-                'total_failures': self.total_failures,
-                'average_match_time_ms': self.average_match_time_ms,
+                'total_matches': totals.matches,
+                'total_failures': totals.failures,
+                'average_match_time_ms': (
+                    totals.total_ns / totals.timed / 1e6
+                    if totals.timed else 0.0),
                 'pair_count': len(self.pairs)
             }
 
 
+class _MatchCounters:
+    """Per-thread match metrics, summed by PatternEngine.get_metrics"""
+    __slots__ = ('matches', 'failures', 'total_ns', 'timed', '_thread')
+    
+    def __init__(self, thread: Optional[threading.Thread] = None):
+        self.matches = 0
+        self.failures = 0
+        self.total_ns = 0  # integer ns, no float drift
+        self.timed = 0     # matches that were timed
+        self._thread = weakref.ref(thread) if thread is not None else None
+    
+    def thread_alive(self) -> bool:
+        """Whether the owning thread can still update these counters"""
+        thread = self._thread() if self._thread is not None else None
+        return thread is not None and thread.is_alive()
+    
+    def absorb(self, other: '_MatchCounters') -> None:
+        """Add another accumulator's totals to this one"""
+        self.matches += other.matches
+        self.failures += other.failures
+        self.total_ns += other.total_ns
+        self.timed += other.timed
+
+
+def _scan_pattern(pattern: str) -> Iterator[Tuple[int, str, bool]]:
+    """Walk a regex source token by token
+    
+    Yields (index, token, in_class). An escape is one two-character token,
+    and every token of a [...] set, brackets included, has in_class set,
+    so callers only need to look at the structural tokens.
+    """
+    class_start = -1  # index of the '[' of the open character class
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == '\\':
+            yield i, pattern[i:i + 2], class_start >= 0
+            i += 2
+            continue
+        if class_start >= 0:
+            yield i, ch, True
+            # ']' right after '[' or '[^' is a literal member
+            if ch == ']' and i > class_start + 1 and not (
+                    i == class_start + 2 and pattern[i - 1] == '^'):
+                class_start = -1
+        elif ch == '[':
+            class_start = i
+            yield i, ch, True
+        else:
+            yield i, ch, False
+        i += 1
+
+
+def _analyze_left(regex: re.Pattern) -> Tuple[bool, Optional[str]]:
+    """Work out whether a left pattern is anchored and its literal prefix
+    
+    A pattern is anchored when it starts with '^' and has no top-level
+    alternative ('^a|b' is not), so it can only match at position 0.
+    """
+    pattern = regex.pattern
+    if not pattern.startswith('^') or regex.flags & re.MULTILINE:
+        return False, None
+    
+    depth = 0
+    for _, token, in_class in _scan_pattern(pattern):
+        if in_class:
+            continue
+        if token == '(':
+            depth += 1
+        elif token == ')':
+            depth -= 1
+        elif token == '|' and depth == 0:
+            return False, None
+    
+    # Case or whitespace folding changes what the source text means
+    if regex.flags & (re.IGNORECASE | re.VERBOSE):
+        return True, None
+    
+    prefix = []
+    i = 1
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == '\\':
+            # Only escaped punctuation is a plain literal
+            if i + 1 >= len(pattern) or pattern[i + 1].isalnum():
+                break
+            literal, step = pattern[i + 1], 2
+        elif ch in _REGEX_META:
+            break
+        else:
+            literal, step = ch, 1
+        if pattern[i + step:i + step + 1] in _QUANTIFIERS:
+            break
+        prefix.append(literal)
+        i += step
+    return True, ''.join(prefix) or None
+
+
+def _compile_template(template: str, regex: re.Pattern
+                      ) -> List[Tuple[str, Optional[Union[int, str]]]]:
+    """Split a right template into literal and capture-group segments
+    
+    $N takes the longest run of digits that names an existing group, so
+    with fewer than 11 groups '$11' is group 1 followed by '1', and with
+    11 or more it is group 11. Placeholders without a matching group
+    stay in the output verbatim.
+    """
+    segments: List[Tuple[str, Optional[Union[int, str]]]] = []
+    pos = 0
+    for placeholder in _PLACEHOLDER_RE.finditer(template):
+        number, name = placeholder.groups()
+        end = placeholder.end()
+        ref: Optional[Union[int, str]] = None
+        if number is not None:
+            if number[0] != '0':
+                for digits in range(len(number), 0, -1):
+                    if int(number[:digits]) <= regex.groups:
+                        ref = int(number[:digits])
+                        end = placeholder.start() + 1 + digits
+                        break
+        elif name in regex.groupindex:
+            ref = name
+        if ref is None:
+            continue
+        if placeholder.start() > pos:
+            segments.append((template[pos:placeholder.start()], None))
+        segments.append(('', ref))
+        pos = end
+    if pos < len(template):
+        segments.append((template[pos:], None))
+    return segments
+
+
+def _expand_template(segments: List[Tuple[str, Optional[Union[int, str]]]]
+                     ) -> str:
+    """Render template segments as a Match.expand template"""
+    return ''.join(
+        lit.replace('\\', '\\\\') if ref is None else f'\\g<{ref}>'
+        for lit, ref in segments
+    )
+
+
+def _format_template(segments: List[Tuple[str, Optional[Union[int, str]]]],
+                     regex: re.Pattern) -> str:
+    """Render template segments as a str.format string
+    
+    Named references are resolved to their group number, so every field
+    indexes the positional tuple returned by Match.groups().
+    """
+    parts = []
+    for lit, ref in segments:
+        if ref is None:
+            parts.append(lit.replace('{', '{{').replace('}', '}}'))
+        else:
+            number = ref if isinstance(ref, int) else regex.groupindex[ref]
+            parts.append(f'{{{number - 1}}}')
+    return ''.join(parts)
+
+
 # Example usage patterns for Python code generation
 DEFAULT_PYTHON_PATTERNS = [
     # Function definition transformation
@@ -196,9 +519,16 @@ DEFAULT_PYTHON_PATTERNS = [
 ]
 
 
+# Compiled once at import and shared by every default engine
+_DEFAULT_COMPILED = [
+    (re.compile(left), right, priority)
+    for left, right, priority in DEFAULT_PYTHON_PATTERNS
+]
+
+
 def create_default_engine() -> PatternEngine:
     """Create pattern engine with default Python transformations"""
     engine = PatternEngine()
-    for left, right, priority in DEFAULT_PYTHON_PATTERNS:
+    for left, right, priority in _DEFAULT_COMPILED:
         engine.add_pair(left, right, priority, right_is_literal=True)
     return engine
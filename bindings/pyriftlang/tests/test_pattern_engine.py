@@ -0,0 +1,191 @@
+# Tests for pyriftlang/pattern_engine.py
+# Run from bindings/pyriftlang: python -m unittest discover tests
+
+import copy
+import dataclasses
+import json
+import os
+import pickle
+import random
+import re
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pattern_engine as pe  # noqa: E402
+
+
+def make_engine(*pairs):
+    engine = pe.PatternEngine()
+    for left, right, priority in pairs:
+        assert engine.add_pair(left, right, priority)
+    return engine
+
+
+def reference_match(pairs, input_str):
+    """Baseline semantics: best priority wins, ties by insertion order"""
+    ranked = sorted(enumerate(pairs), key=lambda item: (item[1][2], item[0]))
+    for index, (left, _, priority) in ranked:
+        match = re.search(left, input_str)
+        if match:
+            return priority, index + 1, match.groupdict()
+    return None
+
+
+class MatchTest(unittest.TestCase):
+
+    def test_priority_beats_leftmost_position(self):
+        engine = make_engine(('b', 'B', 1), ('a', 'A', 2))
+        self.assertEqual(engine.match('ab').output, 'B')
+        self.assertEqual(engine.match('a').output, 'A')
+
+    def test_anchored_pairs(self):
+        engine = make_engine(('^x', 'X', 1), ('y', 'Y', 2), ('^a|z', 'Z', 0))
+        self.assertEqual(engine.match('xy').output, 'X')
+        self.assertEqual(engine.match('yx').output, 'Y')
+        # '^a|z' is not anchored, so 'z' may match anywhere
+        self.assertEqual(engine.match('yxz').output, 'Z')
+
+    def test_named_groups_per_pair(self):
+        engine = make_engine((r'(?P<w>a)=', '{w}1', 1), (r'(?P<w>b)=', '{w}2', 2))
+        result = engine.match('b=')
+        self.assertEqual(result.output, 'b2')
+        self.assertEqual(dict(result.groups), {'w': 'b'})
+
+    def test_group_syntax_inside_class(self):
+        engine = make_engine(('zzz', 'A', 1), (r'[(?P<n>]x', 'B', 2))
+        self.assertFalse(engine.match('_x').matched)
+        self.assertEqual(engine.match('(x').output, 'B')
+
+    def test_backreference_after_escaped_backslash(self):
+        engine = make_engine(('zzz', 'A', 1), (r'(a)\\\1', 'B', 2))
+        self.assertEqual(engine.match('a\\a').output, 'B')
+
+    def test_group_references_and_flags(self):
+        for pattern, text in ((r'(a)\1', 'aa'), (r'(?P<x>a)(?P=x)', 'aa'),
+                              (r'(a)?(?(1)b|c)', 'c')):
+            engine = make_engine(('q', 'Q', 1), (pattern, 'R', 2))
+            self.assertEqual(engine.match(text).output, 'R', pattern)
+        engine = pe.PatternEngine()
+        engine.add_pair(re.compile('AB', re.IGNORECASE), 'L', 1)
+        self.assertEqual(engine.match('xab').output, 'L')
+
+    def test_literal_prefix_short_circuit(self):
+        engine = make_engine(('^abc+', 'P', 1), (r'(b)\1', 'R', 2))
+        self.assertEqual(engine._pairs_snapshot[0].left.literal_prefix, 'ab')
+        self.assertEqual(engine.match('abcc').output, 'P')
+        self.assertEqual(engine.match('xabccbb').output, 'R')
+        self.assertFalse(engine.match('acab').matched)
+
+    def test_matches_reference_semantics(self):
+        patterns = [r'a+b', r'^ab', r'b$', r'(?P<x>a)(?P<y>b)?', r'(?P<x>c)',
+                    r'ba?c', r'\d+', r'x(a|b)y', r'^$', r'', r'(a)\1',
+                    r'c|^a', r'(?<=a)b', r'b(?=c)', r'a{2}', r'^ab*c',
+                    r'[(?P<x>]a', r'\(?P<x>', r'^x(y)']
+        rng = random.Random(1)
+        for _ in range(500):
+            pairs = [(rng.choice(patterns), '$1{x}', rng.randint(1, 5))
+                     for _ in range(rng.randint(1, 6))]
+            engine = make_engine(*pairs)
+            for _ in range(5):
+                text = ''.join(rng.choice('abcxy1(<>') for _ in range(rng.randint(0, 6)))
+                result = engine.match(text)
+                got = None
+                if result.matched:
+                    got = (result.priority, result.transform_id, dict(result.groups))
+                self.assertEqual(got, reference_match(pairs, text), (pairs, text))
+
+
+class TemplateTest(unittest.TestCase):
+
+    def test_numbered_and_named_groups(self):
+        engine = make_engine((r'(\w+)=(?P<v>\d+)?', '$1 is {v}|$3|{nope}', 1))
+        self.assertEqual(engine.match('x=12').output, 'x is 12|$3|{nope}')
+        self.assertEqual(engine.match('x=').output, 'x is |$3|{nope}')
+
+    def test_multi_digit_group_numbers(self):
+        # Fewer groups than the number: longest valid prefix, rest literal
+        engine = make_engine((r'(a)', '$11|$10|$01|$2', 1))
+        self.assertEqual(engine.match('a').output, 'a1|a0|$01|$2')
+        # Enough groups: the whole number is the group
+        engine = make_engine((r'(a)' + r'(\d)' * 11, '$11|$12|$1', 1))
+        self.assertEqual(engine.match('a01234567895').output, '9|5|a')
+
+    def test_default_engine(self):
+        engine = pe.create_default_engine()
+        self.assertEqual(engine.match('@quantum').output, '@rift_quantum_decorator')
+        self.assertEqual(engine.match('def f():').priority, 100)
+        self.assertFalse(engine.match('nothing here').matched)
+
+
+class MatchCacheTest(unittest.TestCase):
+
+    def test_cached_results_are_independent(self):
+        engine = make_engine((r'(?P<k>\w+)=', '{k}', 1))
+        result = engine.match('a=')
+        result.output = 'changed'
+        result.groups['k'] = 'changed'
+        again = engine.match('a=')
+        self.assertIsNot(again, result)
+        self.assertEqual(again.output, 'a')
+        self.assertEqual(again.groups, {'k': 'a'})
+
+    def test_results_serialize(self):
+        engine = make_engine((r'(?P<k>\w+)=', '{k}', 1))
+        for text in ('a=', '', 'a='):  # miss, miss, cache hit
+            result = engine.match(text)
+            self.assertEqual(pickle.loads(pickle.dumps(result)), result)
+            self.assertEqual(copy.deepcopy(result), result)
+            self.assertEqual(dataclasses.asdict(result)['groups'], result.groups)
+            json.dumps(result.groups)
+
+
+class MetricsTest(unittest.TestCase):
+
+    def test_timing_is_opt_in(self):
+        engine = make_engine(('a', 'A', 1))
+        engine.match('a')
+        self.assertEqual(engine.average_match_time_ms, 0.0)
+        engine.enable_metrics()
+        engine.match('ab')
+        self.assertGreater(engine.average_match_time_ms, 0.0)
+        engine.enable_metrics(False)
+        before = engine.get_metrics()['average_match_time_ms']
+        engine.match('abc')
+        self.assertEqual(engine.average_match_time_ms, before)
+
+    def test_totals_across_threads(self):
+        engine = make_engine(('a', 'A', 1))
+        engine.enable_metrics()
+        rounds, per_thread = 3, 8
+
+        def work():
+            for i in range(100):
+                engine.match('a' if i % 4 else f'x{i}')
+
+        for _ in range(rounds):
+            threads = [threading.Thread(target=work) for _ in range(per_thread)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            # Finished threads are folded in, not kept around
+            self.assertLessEqual(len(engine._counters), per_thread)
+
+        engine.match('a')
+        metrics = engine.get_metrics()
+        # The main thread is the only one still alive
+        self.assertEqual(len(engine._counters), 1)
+        threads_run = rounds * per_thread
+        self.assertEqual(metrics['total_matches'], threads_run * 75 + 1)
+        self.assertEqual(metrics['total_failures'], threads_run * 25)
+        self.assertEqual(engine.total_matches, metrics['total_matches'])
+        self.assertEqual(engine.total_failures, metrics['total_failures'])
+        self.assertGreater(engine.average_match_time_ms, 0.0)
+        self.assertEqual(metrics['pair_count'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
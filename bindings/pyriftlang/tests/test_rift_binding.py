@@ -0,0 +1,175 @@
+# Tests for pyriftlang/rift_binding.py
+# Run from bindings/pyriftlang: python -m unittest discover tests
+
+import copy
+import gc
+import os
+import pickle
+import subprocess
+import sys
+import textwrap
+import threading
+import unittest
+from unittest import mock
+
+BINDING_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BINDING_DIR)
+
+import rift_binding as rb  # noqa: E402
+
+
+class TokenPoolReleaseTest(unittest.TestCase):
+
+    def test_gc_inside_pool_lock_does_not_deadlock(self):
+        # Entangled tokens form cycles, so only the cyclic collector frees
+        # them; force it to fire while validate_all() holds the pool lock
+        script = textwrap.dedent(f"""
+            import gc, sys
+            sys.path.insert(0, {BINDING_DIR!r})
+            import rift_binding as rb
+            for offset in range(12):
+                gc.collect()
+                gc.disable()
+                for _ in range(5):
+                    a = rb.RiftToken('a', None)
+                    b = rb.RiftToken('b', None)
+                    a.entangle_with(b, 1)
+                    b.entangle_with(a, 1)
+                del a, b
+                gc.set_threshold(gc.get_count()[0] + offset)
+                gc.enable()
+                rb._TOKEN_POOL.validate_all()
+                rb.RiftToken('c', None)
+            gc.set_threshold(700)
+        """)
+        result = subprocess.run([sys.executable, '-c', script], timeout=30)
+        self.assertEqual(result.returncode, 0)
+
+    def test_collected_ids_are_recycled(self):
+        token = rb.RiftToken('a', None)
+        size = len(rb._TOKEN_POOL.bits)
+        del token
+        for _ in range(4 * rb._TokenPool._GROW_BY):
+            fresh = rb.RiftToken('b', None)
+            del fresh
+        fresh = rb.RiftToken('b', None)
+        self.assertLessEqual(len(rb._TOKEN_POOL.bits),
+                             size + rb._TokenPool._GROW_BY)
+        self.assertEqual(fresh.validation_bits, rb.RiftTokenBits.ALLOCATED)
+
+    def test_concurrent_acquire_hands_out_unique_ids(self):
+        held = [[] for _ in range(8)]
+        start = threading.Barrier(len(held))
+
+        def build(tokens):
+            start.wait()
+            for i in range(5000):
+                tokens.append(rb.RiftToken('t', None))
+                if i % 3 == 0:
+                    tokens.pop(0)  # release ids while others acquire
+
+        threads = [threading.Thread(target=build, args=(tokens,))
+                   for tokens in held]
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)  # switch threads as often as possible
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(interval)
+        ids = [token._id for tokens in held for token in tokens]
+        self.assertEqual(len(ids), len(set(ids)))
+
+
+class TokenCopyTest(unittest.TestCase):
+
+    def make_token(self):
+        token = rb.RiftToken('int', rb.RiftMemorySpan('fixed', 8, alignment=8))
+        token.value = 5
+        token.validate()
+        return token
+
+    def test_copy_gets_its_own_pool_slot(self):
+        token = self.make_token()
+        clone = copy.copy(token)
+        self.assertNotEqual(clone._id, token._id)
+        self.assertIs(clone.memory, token.memory)
+        self.assertEqual(clone.value, 5)
+        self.assertTrue(clone.is_valid())
+
+        # Collecting the original must not touch the copy's slot
+        span = token.memory
+        del token
+        gc.collect()
+        rb.RiftToken('other', rb.RiftMemorySpan('row', 1))
+        self.assertTrue(clone.is_valid())
+        self.assertIs(clone.memory, span)
+
+    def test_copy_does_not_inherit_lock(self):
+        token = self.make_token()
+        self.assertTrue(token.lock())
+        clone = copy.copy(token)
+        self.assertFalse(clone.validation_bits & rb.RiftTokenBits.LOCKED)
+        self.assertTrue(clone.lock())
+        clone.unlock()
+        token.unlock()
+
+    def test_deepcopy_preserves_entanglement_cycle(self):
+        a = rb.RiftToken('a', None)
+        b = rb.RiftToken('b', None)
+        a.entangle_with(b, 1)
+        b.entangle_with(a, 1)
+        a2 = copy.deepcopy(a)
+        b2 = a2._entangled_with[0]
+        self.assertIsNot(b2, b)
+        self.assertIs(b2._entangled_with[0], a2)
+        self.assertEqual(len({a._id, b._id, a2._id, b2._id}), 4)
+
+    def test_pickle_round_trip(self):
+        token = self.make_token()
+        restored = pickle.loads(pickle.dumps(token))
+        self.assertNotEqual(restored._id, token._id)
+        self.assertEqual(restored.value, 5)
+        self.assertEqual(restored.memory, token.memory)
+        self.assertTrue(restored.is_valid())
+
+
+class ValidateAllTest(unittest.TestCase):
+
+    def check_validate_all(self):
+        alignments = (8, 6, 0, 4096)
+        tokens = [rb.RiftToken('t', rb.RiftMemorySpan('fixed', 8, alignment=a))
+                  for a in alignments]
+        tokens.append(rb.RiftToken('unbound', None))
+        self.assertGreaterEqual(rb.validate_all(), 2)
+        governed = [bool(t.validation_bits & rb.RiftTokenBits.GOVERNED)
+                    for t in tokens]
+        self.assertEqual(governed, [True, False, False, True, False])
+        # The bits buffer must be released so the pool can still grow
+        rb._TOKEN_POOL.bits.append(0)
+        rb._TOKEN_POOL.bits.pop()
+
+    @unittest.skipIf(not rb._bulk_backend(), 'numba is not installed')
+    def test_numba_kernel(self):
+        self.check_validate_all()
+
+    def test_python_fallback(self):
+        with mock.patch.object(rb, '_BULK_BACKEND', False):
+            self.check_validate_all()
+
+    def test_import_does_not_load_numba(self):
+        script = textwrap.dedent(f"""
+            import sys
+            sys.path.insert(0, {BINDING_DIR!r})
+            import rift_binding
+            assert 'numba' not in sys.modules, 'numba imported'
+            assert 'numpy' not in sys.modules, 'numpy imported'
+        """)
+        result = subprocess.run([sys.executable, '-c', script], timeout=30)
+        self.assertEqual(result.returncode, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()